@@ -1,32 +1,43 @@
 
 import redis
-from fastapi import FastAPI,File,UploadFile,Form,BackgroundTasks
-from pydantic import BaseModel,validator
-from typing_extensions import Annotated
+import redis.asyncio
+import hashlib
+from fastapi import FastAPI,BackgroundTasks,Request
+import msgspec
 from typing import Union
-import json
 import os
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 from dotenv import load_dotenv
 from pathlib import Path
-from supabase import create_client, Client
-
-# Add asyncio
-import asyncio
+from contextlib import asynccontextmanager
 
 dotenv_path = Path('.env')
 load_dotenv(dotenv_path=dotenv_path)
 
-from utils import call_groq_api  
+from utils import setup_logging, warm_up_llm_connection, close_llm_client
 
 from model import get_response_by_bot
-from concurrent.futures import ThreadPoolExecutor
-executor = ThreadPoolExecutor(max_workers=3)
+from pre_processing import REDIS_CONFIG, Timer
+from post_processing import SupabaseClient, log_to_supabase, flush_pending_logs
+
+# Application lifecycle: warm connections on startup, flush and close clients on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the LLM connection pool before the first request arrives
+    await warm_up_llm_connection()
+    yield
+    # Send buffered Supabase log rows before any client is closed
+    await flush_pending_logs()
+    # Close the shared HTTP client (and its pooled connections), Redis and Supabase
+    await close_llm_client()
+    await redis_client.aclose()
+    await SupabaseClient.close()
+
 
 # Initialize FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 # Add CORS middleware to allow requests from all origins
@@ -39,35 +50,42 @@ app.add_middleware(
 )
 
 
-# Supabase connection details
-SUPABASE_URL = os.getenv("SUPABASE_URL")  # Supabase project URL from environment variable
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")  # Supabase API key from environment variable
-
-# Configure logging for the application
-import logging
-logging.basicConfig(
-    filename="app.log",  # Log file name
-    filemode='a',  # Append to log file
-    format='%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s',  # Log format
-    datefmt='%H:%M:%S',  # Time format in logs
-    level=logging.INFO  # Log level: INFO
+# Redis connection used to cache bot responses
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")  # Redis URL from environment variable
+# Blocking pool so requests wait for a free connection under load instead of failing
+RESPONSE_CACHE_MAX_CONNECTIONS = 50
+redis_client = redis.asyncio.Redis(
+    connection_pool=redis.asyncio.BlockingConnectionPool.from_url(
+        REDIS_URL, **{**REDIS_CONFIG, "max_connections": RESPONSE_CACHE_MAX_CONNECTIONS}
+    )
 )
 
-# Create a Supabase client using project URL and API key
-# Create singleton for Supabase client
-class SupabaseClient:
-    _instance = None
+# Time to keep a cached bot response, in seconds
+RESPONSE_CACHE_TTL = 3600
 
-    @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = create_client(SUPABASE_URL, SUPABASE_KEY)
-        return cls._instance
+def response_cache_key(request):
+    """
+    Builds the Redis key under which the bot response for a request is cached.
 
-supabase = SupabaseClient.get_instance()
+    Args:
+        request (QuestionRequest): Input data containing user's question and related configuration.
+
+    Returns:
+        str: Cache key derived from everything that goes into the bot prompt.
+    """
+    # Hash a JSON array of the fields so no two different requests share a key
+    digest = hashlib.blake2b(
+        msgspec.json.encode([request.llm, request.personality_prompt, request.last_three_responses, request.question]),
+        digest_size=16,
+    ).hexdigest()
+    return "cvchat:" + digest
+
+# Configure logging for the application
+import logging
+setup_logging()  # Queue-backed handler writing to app.log, configured once per process
 
-# Define a Pydantic model for the incoming request body
-class QuestionRequest(BaseModel):
+# Define a msgspec struct for the incoming request body (decoded in C, much faster than Pydantic)
+class QuestionRequest(msgspec.Struct):
     """
     Model for incoming question request data.
     
@@ -85,14 +103,47 @@ class QuestionRequest(BaseModel):
     last_three_responses: str = ""  # Context from last three responses
 
 
+# Define a Pydantic model for the chat response; declaring it as the response_model lets
+# FastAPI serialize the response straight to JSON with Pydantic instead of jsonable_encoder + json
+class ChatResponse(BaseModel):
+    """
+    Model for outgoing chat response data.
+
+    Attributes:
+        response (Union[str, None]): The bot's answer.
+        cit (Union[float, str, None]): Citation or source for the information, if available.
+        drt (Union[float, None]): Data retrieval time in milliseconds.
+        rgt (Union[float, None]): Response generation time in milliseconds.
+    """
+    response: Union[str, None] = None  # Bot's answer
+    cit: Union[float, str, None] = None  # Citation or source
+    drt: Union[float, None] = None  # Data retrieval time
+    rgt: Union[float, None] = None  # Response generation time
+
+
+# Reusable decoder for the request body
+question_request_decoder = msgspec.json.Decoder(QuestionRequest)
+
+# JSON schema of the request body, so the OpenAPI docs still describe it
+_, _question_request_components = msgspec.json.schema_components([QuestionRequest])
+QUESTION_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": _question_request_components["QuestionRequest"]}
+        },
+    }
+}
+
 # Define the endpoint for chat functionality
-@app.post("/cv/chat")
-async def cv_chat(request: QuestionRequest, background_tasks: BackgroundTasks):
+@app.post("/cv/chat", response_model=ChatResponse, openapi_extra=QUESTION_REQUEST_OPENAPI)
+async def cv_chat(http_request: Request, background_tasks: BackgroundTasks):
     """
     Endpoint to handle chatbot queries.
 
     Args:
-        request (QuestionRequest): Input data containing user's question and related configuration.
+        http_request (Request): Raw HTTP request whose JSON body is decoded into a QuestionRequest
+            containing user's question and related configuration.
         background_tasks (BackgroundTasks): Tasks to be performed asynchronously.
 
     Returns:
@@ -116,15 +167,52 @@ async def cv_chat(request: QuestionRequest, background_tasks: BackgroundTasks):
             "rgt": 345.22
         }
     """
+    # Decode and validate the request body
+    try:
+        request = question_request_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        return JSONResponse({"error": f"Invalid request body: {e}"}, status_code=422)
+
     try:
         # Validate if the question is provided and not empty
         if not request.question or request.question.strip() == "":
-            return {"error": str("Please provide a question")}  # Return error if invalid
-
-
+            return JSONResponse({"error": "Please provide a question"}, status_code=400)  # Return error if invalid
+
+        # No retrieval step runs here, so there is no citation or data retrieval time to report
+        cit = None
+        drt = None
+
+        # Serve repeated questions straight from the response cache
+        cache_key = response_cache_key(request)
+        with Timer() as cache_timer:
+            try:
+                cached = await redis_client.get(cache_key)
+            except redis.RedisError as e:
+                logging.info(f"Error reading response cache: {e}")
+                cached = None
+        if cached:
+            # Only the response text is cached; timings describe this request
+            cached_response = {
+                "response": cached.decode("utf-8"),
+                "cit": cit,
+                "drt": drt,
+                "rgt": cache_timer.duration_ms
+            }
+            # Cached answers are still logged to Supabase after the response has been sent
+            background_tasks.add_task(
+                log_to_supabase,
+                request.question,
+                cached_response["response"],
+                cit=cit,
+                drt=drt,
+                rgt=cached_response["rgt"],
+                personality=request.personality,
+                llm=request.llm,
+            )
+            return cached_response
 
         # Generate bot response using the provided information and language model
-        bot_response = get_response_by_bot(
+        bot_response = await get_response_by_bot(
             request.question, cit, drt, request.llm, request.personality_prompt, request.last_three_responses
         )
 
@@ -132,13 +220,29 @@ async def cv_chat(request: QuestionRequest, background_tasks: BackgroundTasks):
         if isinstance(bot_response, dict) and "response" in bot_response:
             response_data = bot_response["response"]
         else:
-            return {"error": "Bot response format is invalid"}  # Return error if invalid
+            return JSONResponse({"error": "Bot response format is invalid"}, status_code=502)  # Return error if invalid
 
         # Log the input question, relative info, and bot response
         logging.info(f"Question: {request.question}")
         logging.info(f"Response: {response_data}")
 
-        
+        # Log the interaction to Supabase after the response has been sent
+        background_tasks.add_task(
+            log_to_supabase,
+            request.question,
+            response_data,
+            cit=bot_response.get("cit"),
+            drt=bot_response.get("drt"),
+            rgt=bot_response.get("rgt"),
+            personality=request.personality,
+            llm=request.llm,
+        )
+
+        # Cache the response for identical future questions
+        try:
+            await redis_client.set(cache_key, response_data, ex=RESPONSE_CACHE_TTL)
+        except redis.RedisError as e:
+            logging.info(f"Error writing response cache: {e}")
 
         return bot_response
     
@@ -146,4 +250,4 @@ async def cv_chat(request: QuestionRequest, background_tasks: BackgroundTasks):
     except Exception as e:
         logging.info(f"Error: {e}")  # Log the error for debugging
         print("Error:", e)
-        return {"error": str("Error occurred while generating the quiz and summary")}  # Return error message
+        return JSONResponse({"error": "Error occurred while generating the quiz and summary"}, status_code=500)  # Return error message
@@ -1,9 +1,30 @@
 import time 
-import json
-import asyncio
+from collections import defaultdict
+from functools import lru_cache
 from utils import call_groq_api
 
-def get_response_by_bot(question,cit, drt,model,personality_prompt,last_three_responses):
+# Invariant head of the bot prompt, filled once per personality prompt with str.format_map
+BOT_PROMPT_PREFIX_TEMPLATE = """
+    ## Instruction{personality_block}
+        Here is relative information about you: {relative_info}
+        NOTE: If there’s any relevant info about you, I’ll weave it into the chat naturally, so it feels personalized. But if it’s not available or doesn’t quite match the conversation, I’ll focus on the here and now, keeping the energy high and the talk flowing. No need to bring it up unless it’s useful, we’re just vibing!
+        Response should not be long, keep it small and to the point.
+        - Dont add translations
+"""
+
+@lru_cache(maxsize=128)
+def get_bot_prompt_prefix(personality_prompt):
+    """Returns the bot prompt head for a personality prompt, built once and cached."""
+    # An empty personality prompt is left out instead of sending a blank line
+    return BOT_PROMPT_PREFIX_TEMPLATE.format_map(defaultdict(str,
+        personality_block=f"\n        {personality_prompt}" if personality_prompt else "",
+        relative_info="",
+    ))
+
+# Precompute the prefix for the default (empty) personality prompt at import
+get_bot_prompt_prefix("")
+
+async def get_response_by_bot(question,cit, drt,model,personality_prompt,last_three_responses):
     """
         Generates a chatbot response based on user input, contextual information, and personality.
 
@@ -38,27 +59,29 @@ def get_response_by_bot(question,cit, drt,model,personality_prompt,last_three_re
                 }
     """
     # Start Response Generation Time measurement
-    start_rgt = time.time()
+    start_rgt = time.perf_counter_ns()
 
-    # Prepare the bot prompt
-    bot_prompt ="""
-    ## Instruction
-        {personality_prompt}
-        Here is relative information about you: {relative_info}
-        NOTE: If there’s any relevant info about you, I’ll weave it into the chat naturally, so it feels personalized. But if it’s not available or doesn’t quite match the conversation, I’ll focus on the here and now, keeping the energy high and the talk flowing. No need to bring it up unless it’s useful, we’re just vibing!
-        Response should not be long, keep it small and to the point.
-        - Dont add translations
-    ## Last 3 Responses you have given
-        {last_three_responses}
-    ## User Question
-    Answer the user question:{question}
-    """.replace("{question}", question).replace("{personality_prompt}",personality_prompt).replace("{last_three_responses}",last_three_responses)
+    # Prepare the bot prompt: the cached personality prefix goes out as the system message
+    # (its JSON encoding is cached too), only the context and question are built per request
+    system_prompt = get_bot_prompt_prefix(personality_prompt)
+    bot_prompt = (
+        f"    ## User Question\n"
+        f"    Answer the user question:{question}\n"
+        f"    "
+    )
+    # Skip the previous responses block on first-turn chats so no tokens are spent on it
+    if last_three_responses:
+        bot_prompt = (
+            f"    ## Last 3 Responses you have given\n"
+            f"        {last_three_responses}\n"
+            f"{bot_prompt}"
+        )
 
     # Call the API to get the response
-    bot_prompt_response = call_groq_api(bot_prompt)
+    bot_prompt_response = await call_groq_api(bot_prompt, system_prompt=system_prompt)
 
     # Calculate Response Generation Time (RGT)
-    rgt = round((time.time() - start_rgt) * 1000, 2)  # in milliseconds
+    rgt = round((time.perf_counter_ns() - start_rgt) / 1_000_000, 2)  # in milliseconds
 
     # Prepare the final response
     response_json = {
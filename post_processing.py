@@ -1,25 +1,113 @@
 #postprocessing
-from datetime import datetime
+from datetime import datetime, timezone
+import asyncio
+import os
 
 # Configure logging for the application
 import logging
 
-from utils import call_groq_api
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from postgrest.types import ReturnMethod
 
-logging.basicConfig(
-    filename="app.log",  # Log file name
-    filemode='a',  # Append to log file
-    format='%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s',  # Log format
-    datefmt='%H:%M:%S',  # Time format in logs
-    level=logging.INFO  # Log level: INFO
-)
+from utils import setup_logging
 
-def log_to_supabase(supabase,user_question, bot_response, cit=None, drt=None, rgt=None, personality=None, llm=None,relative_info=None):
+setup_logging()  # Queue-backed handler writing to app.log, configured once per process
+
+# Supabase connection details
+SUPABASE_URL = os.getenv("SUPABASE_URL")  # Supabase project URL from environment variable
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")  # Supabase API key from environment variable
+
+# Create an async PostgREST client for Supabase using project URL and API key
+# Create singleton for Supabase client, built on first get_instance() call
+class SupabaseClient:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = AsyncPostgrestClient(
+                f"{SUPABASE_URL}/rest/v1",
+                headers={
+                    **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                    "apikey": SUPABASE_KEY,
+                    "Authorization": f"Bearer {SUPABASE_KEY}",
+                },
+            )
+        return cls._instance
+
+    @classmethod
+    async def close(cls):
+        # Only close the client if it was ever created
+        if cls._instance is not None:
+            await cls._instance.aclose()
+            cls._instance = None
+
+# Log rows are buffered and inserted together once per flush interval (seconds)
+LOG_FLUSH_INTERVAL = 0.5
+_pending_logs = []
+_flush_scheduled = False
+
+# Strong references to running flush tasks so they are not garbage collected
+_flush_tasks = set()
+
+def build_log_row(user_question, bot_response, cit=None, drt=None, rgt=None, personality=None, llm=None, relative_info=None):
+    """Builds the chatbot_logs row for one chatbot interaction."""
+    return {
+        "user_question": user_question,
+        "bot_response": bot_response,
+        "cit": cit,
+        "drt": drt,
+        "rgt": rgt,
+        "personality": personality,
+        "llm": llm,
+        "relative_data" : relative_info,
+        "timestamp": datetime.now(timezone.utc).isoformat()  # ISO format for timestamp (UTC, timezone aware)
+    }
+
+async def _insert_logs(rows):
+    """Inserts log rows in one PostgREST call, logging (not raising) any failure."""
+    if not rows:
+        return
+    try:
+        await SupabaseClient.get_instance().from_("chatbot_logs").insert(rows, returning=ReturnMethod.minimal).execute()
+        logging.info(f"Logged {len(rows)} rows to Supabase")
+    except Exception as e:
+        logging.info(f"Error logging to Supabase: {e}")
+
+def _take_pending_logs():
+    """Removes and returns the buffered log rows."""
+    rows = _pending_logs[:]
+    _pending_logs.clear()
+    return rows
+
+async def _flush_logs():
+    """Waits for the flush interval, then inserts all buffered log rows in one PostgREST call."""
+    global _flush_scheduled
+    await asyncio.sleep(LOG_FLUSH_INTERVAL)
+    rows = _take_pending_logs()
+    # Rows logged while this insert is in flight start the next window
+    _flush_scheduled = False
+    await _insert_logs(rows)
+
+async def flush_pending_logs():
     """
-    Logs chatbot interaction details to Supabase.
+    Inserts any buffered log rows right away and waits for running flushes to finish.
+
+    Meant to be called on application shutdown, before the shared HTTP client is closed.
+    """
+    await _insert_logs(_take_pending_logs())
+    if _flush_tasks:
+        await asyncio.gather(*_flush_tasks, return_exceptions=True)
+
+async def log_to_supabase(user_question, bot_response, cit=None, drt=None, rgt=None, personality=None, llm=None, relative_info=None):
+    """
+    Queues chatbot interaction details to be logged to Supabase.
+
+    Rows are buffered and inserted in batches through the async PostgREST client, so this
+    returns immediately. Meant to be run as a FastAPI background task.
 
     Args:
-        supabase (Client): Supabase client instance for database operations.
         user_question (str): The user's question.
         bot_response (str): Chatbot's response to the user.
         cit (str, optional): Citation or source for any relevant information.
@@ -34,7 +122,6 @@ def log_to_supabase(supabase,user_question, bot_response, cit=None, drt=None, rg
 
     Example:
         Input:
-            supabase = <supabase_client>
             user_question = "Who is the Prime Minister of India?"
             bot_response = "The Prime Minister of India is Narendra Modi."
             cit = 143.4
@@ -45,31 +132,22 @@ def log_to_supabase(supabase,user_question, bot_response, cit=None, drt=None, rg
             relative_info = "PM of India is Narendra Modi since 2014."
 
         Output:
-            None (Logs the data to Supabase and logs success/failure in the application logs.)
+            None (Queues the row; the batch insert logs success/failure in the application logs.)
     """
-    try:
-        # Prepare data to insert
-        data = {
-            "user_question": user_question,
-            "bot_response": bot_response,
-            "cit": cit,
-            "drt": drt,
-            "rgt": rgt,
-            "personality": personality,
-            "llm": llm,
-            "relative_data" : relative_info,
-            "timestamp": datetime.utcnow().isoformat()  # ISO format for timestamp
-        }
-
-        # Insert into Supabase
-        response = supabase.table("chatbot_logs").insert(data).execute()
-        logging.info(f"Logged to Supabase: {response}")
-    except Exception as e:
-        logging.info(f"Error logging to Supabase: {e}")
+    global _flush_scheduled
+    _pending_logs.append(build_log_row(user_question, bot_response, cit, drt, rgt, personality, llm, relative_info))
 
+    # Start a flush for this window unless one is already pending
+    if not _flush_scheduled:
+        _flush_scheduled = True
+        task = asyncio.create_task(_flush_logs())
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
 
 
 _all_ =[
-  "log_to_supabase"
+  "SupabaseClient",
+  "log_to_supabase",
+  "flush_pending_logs"
 ]
 
@@ -1,39 +1,97 @@
-from functools import lru_cache
-from typing import Tuple, Optional
 import time
+import asyncio
+import hashlib
+import weakref
 import redis
+import redis.asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from model import call_groq_api
-
-@lru_cache(maxsize=128)
-def get_redis_data(r: redis.Redis, pattern: str, batch_size: int = 100) -> list:
-    """Efficiently retrieve Redis data using pipelining"""
-    results = []
-    cursor = "0"
-    
-    while cursor != 0:
+from cachetools import TTLCache
+
+# Lua script that SCANs for a pattern and MGETs every batch server side,
+# returning a flat key/value list (missing values come back as nil)
+SCAN_MGET_SCRIPT = """
+local cursor = ARGV[1]
+local pattern = ARGV[2]
+local count = tonumber(ARGV[3])
+local out = {}
+repeat
+    local page = redis.call('SCAN', cursor, 'MATCH', pattern, 'COUNT', count)
+    cursor = page[1]
+    local keys = page[2]
+    if #keys > 0 then
+        local values = redis.call('MGET', unpack(keys))
+        for i, key in ipairs(keys) do
+            out[#out + 1] = key
+            out[#out + 1] = values[i]
+        end
+    end
+until cursor == '0'
+return out
+"""
+
+# SHA of the script, computed once; calls go through EVALSHA so the body is only sent when Redis lacks it
+SCAN_MGET_SHA = hashlib.sha1(SCAN_MGET_SCRIPT.encode('utf-8')).hexdigest()
+
+async def _scan_and_get(r: redis.asyncio.Redis, pattern: str, batch_size: int) -> list:
+    """Run SCAN_MGET_SCRIPT on the server, sending its body only if the server has not cached it yet"""
+    try:
+        return await r.evalsha(SCAN_MGET_SHA, 0, "0", pattern, batch_size)
+    except redis.exceptions.NoScriptError:
+        # EVAL also caches the script server side, so later calls hit EVALSHA again
+        return await r.eval(SCAN_MGET_SCRIPT, 0, "0", pattern, batch_size)
+
+# SCAN results cached per (server, db, pattern, batch size) for a short time
+_scan_cache = TTLCache(maxsize=128, ttl=30)
+# One lock per cache key coalesces concurrent identical scans; unused locks drop out on their own
+_scan_locks = weakref.WeakValueDictionary()
+
+def _scan_cache_key(r: redis.asyncio.Redis, pattern: str, batch_size: int) -> tuple:
+    """Cache key identifying the Redis server and database a scan runs against"""
+    conn = r.connection_pool.connection_kwargs
+    return (conn.get('host'), conn.get('port'), conn.get('path'), conn.get('db', 0), pattern, batch_size)
+
+async def get_redis_data(r: redis.asyncio.Redis, pattern: str, batch_size: int = 100) -> bytes:
+    """Retrieve Redis data as newline separated "key - value" lines sorted by key, cached per pattern for 30 seconds"""
+    cache_key = _scan_cache_key(r, pattern, batch_size)
+    hit = _scan_cache.get(cache_key)
+    if hit is not None:
+        return hit
+
+    lock = _scan_locks.get(cache_key)
+    if lock is None:
+        lock = _scan_locks[cache_key] = asyncio.Lock()
+
+    async with lock:
+        # A concurrent caller may have filled the cache while we waited
+        hit = _scan_cache.get(cache_key)
+        if hit is not None:
+            return hit
+
+        # Whole SCAN + MGET loop runs inside Redis in a single round-trip
         try:
-            cursor, keys = r.scan(cursor=cursor, match=pattern, count=batch_size)
-            if not keys:
-                continue
-                
-            with r.pipeline(transaction=False) as pipe:
-                for key in keys:
-                    pipe.get(key)
-                values = pipe.execute()
-                
-                results.extend(
-                    (key.decode('utf-8'), value.decode('utf-8'))
-                    for key, value in zip(keys, values)
-                    if value is not None
-                )
-                
+            flat = await _scan_and_get(r, pattern, batch_size)
         except redis.RedisError as e:
             logging.error(f"Redis error during scan/get: {e}")
-            break
-            
-    return results
+            return b""
+
+        # Reply is a flat [key1, value1, key2, value2, ...] list; order the pairs by key
+        # client side so the script stays a single pass of per-page MGETs
+        pairs = sorted(zip(flat[::2], flat[1::2]), key=lambda pair: pair[0])
+
+        # Stream the pairs into one buffer
+        buf = bytearray()
+        for key, value in pairs:
+            if value is None:
+                continue
+            if buf:
+                buf += b"\n"
+            buf += key
+            buf += b" - "
+            buf += value
+
+        results = bytes(buf)
+        _scan_cache[cache_key] = results
+        return results
 
 class Timer:
     """Precise timing context manager"""
@@ -44,11 +102,11 @@ class Timer:
         self.start = 0
 
     def __enter__(self):
-        self.start = time.perf_counter()
+        self.start = time.perf_counter_ns()
         return self
 
     def __exit__(self, *args):
-        self.duration_ms = round((time.perf_counter() - self.start) * 1000, 2)
+        self.duration_ms = round((time.perf_counter_ns() - self.start) / 1_000_000, 2)
 
 
 # Configuration constants
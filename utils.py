@@ -1,13 +1,95 @@
 #helping functions related to read, write and publish model metrics
 #utils
-import requests
 import os
+import atexit
+import queue
+import logging
+import logging.handlers
 
 from dotenv import load_dotenv
 load_dotenv()
-from openai import OpenAI
+import httpx
+import orjson
+from functools import lru_cache
 
-def call_groq_api(prompt,model="meta-llama/llama-3.1-70b-instruct"):
+# Log format shared by every module writing to the application log
+LOG_FORMAT = '%(asctime)s,%(msecs)d %(name)s %(levelname)s %(message)s'
+LOG_DATEFMT = '%H:%M:%S'
+
+# Listener thread that owns the log file handler; set once logging is configured
+_log_listener = None
+
+def setup_logging(filename="app.log", level=logging.INFO):
+    """
+    Configures application logging so records are written to the log file off the event loop.
+
+    Log calls only put records on an in-memory queue; a QueueListener thread owns the
+    FileHandler and does the disk I/O. Safe to call from several modules, only the first
+    call configures logging.
+
+    Args:
+        filename (str): Log file name, appended to. Default is "app.log".
+        level (int): Log level for the root logger. Default is logging.INFO.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    file_handler = logging.FileHandler(filename, mode='a')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _log_listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_log_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+# Novita AI exposes an OpenAI compatible chat completions endpoint
+NOVITA_BASE_URL = "https://api.novita.ai/v3/openai"
+NOVITA_CHAT_URL = f"{NOVITA_BASE_URL}/chat/completions"
+
+# Shared async HTTP client so connections are pooled and kept alive across requests
+_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=30,
+)
+
+@lru_cache(maxsize=128)
+def encode_system_message(content):
+    """Returns the JSON-encoded system message for a prompt, encoded once and cached."""
+    return orjson.dumps({"role": "system", "content": content})
+
+def build_chat_completion_body(model, prompt, system_prompt=None, stream=False):
+    """
+    Builds the chat completions request body as JSON bytes.
+
+    Only the per-request user message is encoded here; the system message is spliced in
+    from its cached encoding.
+
+    Args:
+        model (str): The model to use for generating responses.
+        prompt (str): The user message content.
+        system_prompt (str, optional): The system message content, sent first when given.
+        stream (bool): Whether to stream the response. Default is False.
+
+    Returns:
+        bytes: The JSON request body.
+    """
+    messages = orjson.dumps({"role": "user", "content": prompt})
+    if system_prompt:
+        messages = encode_system_message(system_prompt) + b"," + messages
+    return (
+        b'{"model":' + orjson.dumps(model)
+        + b',"stream":' + (b"true" if stream else b"false")
+        + b',"messages":[' + messages + b"]}"
+    )
+
+async def call_groq_api(prompt,model="meta-llama/llama-3.1-70b-instruct",system_prompt=None):
     """
     Calls the Novita AI API to interact with a specified language model, sending a prompt 
     and retrieving the model's response.
@@ -15,6 +97,7 @@ def call_groq_api(prompt,model="meta-llama/llama-3.1-70b-instruct"):
     Args:
         prompt (str): The text prompt to send to the model.
         model (str): The model to use for generating responses. Default is "meta-llama/llama-3.1-70b-instruct".
+        system_prompt (str, optional): Static instructions sent as a system message before the prompt.
 
     Returns:
         str: The response content generated by the model.
@@ -30,33 +113,48 @@ def call_groq_api(prompt,model="meta-llama/llama-3.1-70b-instruct"):
         Output:
             "The capital of India is New Delhi."
     """
-    client = OpenAI(
-        base_url="https://api.novita.ai/v3/openai",
-        # Get the Novita AI API Key by referring to: https://novita.ai/docs/get-started/quickstart.html#_2-manage-api-key.
-        api_key= os.getenv("NOVITA_API_KEY"),
-    )
-
     # Selecting the default model
     model = "meta-llama/llama-3.1-70b-instruct"
 
     # Stream the response False
     stream = False 
 
-    # Chat completion API call
-    chat_completion_res = client.chat.completions.create(
-        model=model,
-        messages=[
-             {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        stream=stream,
+    # Chat completion API call over the shared async client, posting the pre-encoded body
+    response = await _client.post(
+        NOVITA_CHAT_URL,
+        content=build_chat_completion_body(model, prompt, system_prompt, stream),
+        # Get the Novita AI API Key by referring to: https://novita.ai/docs/get-started/quickstart.html#_2-manage-api-key.
+        headers={
+            "Authorization": f"Bearer {os.getenv('NOVITA_API_KEY')}",
+            "Content-Type": "application/json",
+        },
     )
+    response.raise_for_status()
 
     # Return the response
-    return chat_completion_res.choices[0].message.content
+    return response.json()["choices"][0]["message"]["content"]
+
+async def warm_up_llm_connection():
+    """
+    Opens a pooled connection to the LLM API ahead of traffic so the first user request
+    does not pay the TCP/TLS handshake. Failures are logged and otherwise ignored.
+    """
+    try:
+        await _client.get(
+            f"{NOVITA_BASE_URL}/models",
+            headers={"Authorization": f"Bearer {os.getenv('NOVITA_API_KEY')}"},
+            timeout=5,
+        )
+    except httpx.HTTPError as e:
+        logging.info(f"LLM connection warm-up failed: {e}")
+
+async def close_llm_client():
+    """Closes the shared HTTP client and its pooled connections. Call once on application shutdown."""
+    await _client.aclose()
 
 _all_ = [
-    "call_groq_api"
+    "setup_logging",
+    "call_groq_api",
+    "warm_up_llm_connection",
+    "close_llm_client"
 ]